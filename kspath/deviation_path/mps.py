@@ -2,10 +2,12 @@
 Martins, Pascoal and Santos deviation path algorithm.
 """
 
+from collections.abc import Mapping
+import hashlib
 from heapq import heappush, heappop
-from itertools import count
-
-import networkx as nx
+from itertools import count, islice
+from numbers import Integral
+import struct
 
 
 # Modified from networkx/algorithms/simple_paths.py:
@@ -60,6 +62,528 @@ class PathBuffer(object):
         self._paths.remove(tuple(path))
         return cost, path, deviation_index, deviation_path_cost
 
+    def entries(self):
+        """Returns the raw heap entries in heap order.
+
+            Returns
+            -------
+                : list[tuple[float, int, list[str | int], int, float]]
+        """
+        return list(self._sorted_paths)
+
+    def next_count(self):
+        """Returns the next value of the tiebreaker counter without
+        consuming it.
+
+            Returns
+            -------
+                : int
+        """
+        value = next(self._counter)
+        self._counter = count(value)
+        return value
+
+    @classmethod
+    def from_entries(cls, entries, next_count):
+        """Recreates a PathBuffer from heap entries returned by `entries`.
+
+            Parameters
+            ----------
+                entries : list[tuple[float, int, list[str | int], int, float]]
+                    Heap entries in heap order
+
+                next_count : int
+                    Next value of the tiebreaker counter
+        """
+        path_buffer = cls()
+        path_buffer._sorted_paths = list(entries)
+        path_buffer._paths = {tuple(entry[2]) for entry in entries}
+        path_buffer._counter = count(next_count)
+        return path_buffer
+
+
+class _OverlayDict(Mapping):
+    """Read-only dict which overrides and removes some keys of a shared
+    dict without copying it."""
+    def __init__(self, base, overrides, removed):
+        """
+        Parameters
+        ----------
+            base : dict
+                The shared dict, which is not modified
+
+            overrides : dict
+                Keys whose values replace those of `base`
+
+            removed : set
+                Keys of `base` not in the overlay, unless in `overrides`
+        """
+        self._base = base
+        self._overrides = overrides
+        self._removed = removed
+
+    def __getitem__(self, key):
+        if key in self._overrides:
+            return self._overrides[key]
+        if key in self._removed:
+            raise KeyError(key)
+        return self._base[key]
+
+    def __contains__(self, key):
+        return key in self._overrides or (key in self._base
+                                          and key not in self._removed)
+
+    def __iter__(self):
+        for key in self._base:
+            if key in self:
+                yield key
+        for key in self._overrides:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _nx():
+    """Returns the networkx module, which is imported lazily to keep
+    `import kspath` fast."""
+    import networkx
+    return networkx
+
+
+def radix_heap_dijkstra(G, source, weight='weight'):
+    """Dijkstra's algorithm for graphs with non-negative integer weights
+    using a radix heap.
+
+    Each queued node is stored in the bucket given by the highest bit in
+    which its distance differs from the last distance removed, so it is
+    moved between buckets at most once per bit instead of being sifted
+    through a binary heap. The heap is inlined as it is the hot loop.
+
+    Parameters
+    ----------
+        G : networkx.DiGraph
+
+        source : str
+            Starting node for the shortest paths
+
+        weight : str
+            The key attribute of `G` indicating the integer weight of an edge
+
+    Returns
+    -------
+        (dist, paths) : tuple[dict[str, int], dict[str, list[str]]]
+            Same as networkx.single_source_dijkstra
+    """
+    dist = {}
+    seen = {source: 0}
+    paths = {source: [source]}
+    # as in networkx's dijkstra, avoid creating a view for every node
+    adjacency = G._adj
+    buckets = [[(0, source)]]
+    last_dist = 0
+    size = 1
+    while size:
+        if not buckets[0]:
+            index = 1
+            while not buckets[index]:
+                index += 1
+            bucket = buckets[index]
+            buckets[index] = []
+            last_dist = min(node_dist for node_dist, _ in bucket)
+            for item in bucket:
+                buckets[(item[0] ^ last_dist).bit_length()].append(item)
+        node_dist, node = buckets[0].pop()
+        size -= 1
+        if node in dist:
+            continue
+        dist[node] = node_dist
+        for neighbor, data in adjacency[node].items():
+            neighbor_dist = node_dist + data[weight]
+            if neighbor not in dist and (neighbor not in seen
+                                         or neighbor_dist < seen[neighbor]):
+                seen[neighbor] = neighbor_dist
+                index = (neighbor_dist ^ last_dist).bit_length()
+                while len(buckets) <= index:
+                    buckets.append([])
+                buckets[index].append((neighbor_dist, neighbor))
+                size += 1
+                paths[neighbor] = paths[node] + [neighbor]
+    return dist, paths
+
+
+def _integer_weight(value):
+    """Returns `value` as an int if it is a non-negative integral weight,
+    else None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, Integral):
+        value = int(value)
+    elif isinstance(value, float) and value.is_integer():
+        value = int(value)
+    else:
+        return None
+    return value if value >= 0 else None
+
+
+_CURSOR_MAGIC = b'KSPC'
+_CURSOR_VERSION = 1
+# magic, version, graph fingerprint, phase, number of nodes, target index,
+# source index, consecutive cycles, next counter value,
+# number of candidate paths, number of simple paths found,
+# number of paths accepted by Yen's algorithm, number of avoided nodes,
+# number of avoided edges
+_CURSOR_HEADER = struct.Struct('<4sBQBIIIIQIIIII')
+# cost, counter, deviation index, deviation path cost
+_CURSOR_ENTRY = struct.Struct('<dQId')
+_CURSOR_INTEGER_ENTRY = struct.Struct('<qQIq')
+# prefix length, suffix head index (or _NO_SUFFIX)
+_CURSOR_PATH = struct.Struct('<II')
+_NO_SUFFIX = 0xFFFFFFFF
+_INDEX_FORMAT = '<%dI'
+
+_MPS_PHASE = 0
+_YEN_PHASE = 1
+_EXHAUSTED_PHASE = 2
+
+
+class PathCursor(object):
+    """Resumable enumeration of the K shortest simple paths from a source to
+    the target of a SingleTargetDeviationPathAlgorithm.
+
+    Unlike a generator, a cursor can be suspended, serialized with
+    `to_bytes` and resumed later with `from_bytes` on another
+    SingleTargetDeviationPathAlgorithm built from the same graph and target.
+    Fetching the next page of paths then only costs the incremental work,
+    also after reverting to Yen's algorithm as its accepted paths and
+    candidate paths are part of the state.
+    """
+    def __init__(self, algorithm, source):
+        """
+        Parameters
+        ----------
+            algorithm : SingleTargetDeviationPathAlgorithm
+                The algorithm instance to enumerate paths with
+
+            source : str
+                The source node of interest
+        """
+        self._algorithm = algorithm
+        self.source = source
+        self._candidate_paths = PathBuffer()
+        self._simple_paths_found = set()
+        self._consecutive_cycles = 0
+        self._accepted_paths = []
+
+        # check that there is actually a path from source to target
+        if source in algorithm._paths:
+            # first candidate path is the shortest path
+            zero_cost = 0 if algorithm._integer_weights else 0.0
+            self._candidate_paths.push(cost=zero_cost,
+                                       path=algorithm._paths[source],
+                                       deviation_index=0,
+                                       deviation_path_cost=zero_cost)
+            self._phase = _MPS_PHASE
+        else:
+            self._phase = _EXHAUSTED_PHASE
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._phase == _MPS_PHASE:
+            path = self._next_mps_path()
+            if path is not None:
+                return path
+        if self._phase == _YEN_PHASE:
+            path = self._next_yen_path()
+            if path is not None:
+                return path
+        raise StopIteration
+
+    next = __next__  # python 2
+
+    def next_paths(self, k):
+        """Returns up to the next `k` shortest simple paths.
+
+        Parameters
+        ----------
+            k : int
+                Maximum number of paths to return
+
+        Returns
+        -------
+            : list[list[str]]
+                Fewer than `k` paths are returned only if all simple paths
+                have been enumerated.
+        """
+        return list(islice(self, k))
+
+    def _next_mps_path(self):
+        """Searches deviation paths until a simple path is found.
+
+        Returns
+        -------
+            : list[str] | None
+                None if all candidate paths have been searched or
+                max_consecutive_cycles has been reached.
+        """
+        algorithm = self._algorithm
+        max_consecutive_cycles = algorithm._max_consecutive_cycles
+
+        # check whether all candidate paths have been searched
+        while self._candidate_paths:
+            # search infinitely if max_consecutive_cycles is None or < 0
+            # Yen's algorithm if max_consecutive_cycles == 0
+            max_consecutive_cycles_reached = (
+                max_consecutive_cycles is not None
+                and 0 <= max_consecutive_cycles <= self._consecutive_cycles
+            )
+            if max_consecutive_cycles_reached:
+                self._start_yen()
+                return None
+
+            path_cost, path, deviation_index, deviation_path_cost = (
+                self._candidate_paths.pop()
+            )
+
+            # check for no cycles
+            is_simple_path = len(set(path)) == len(path)
+            if is_simple_path:
+                self._simple_paths_found.add(tuple(path))
+                self._consecutive_cycles = 0
+            else:
+                self._consecutive_cycles += 1
+
+            # deviations are searched before returning so that the cursor
+            # is always in a consistent state when suspended
+            algorithm.mps_deviation_paths(path_cost,
+                                          path,
+                                          deviation_index,
+                                          deviation_path_cost,
+                                          self._candidate_paths)
+            if is_simple_path:
+                return path
+
+        self._phase = _EXHAUSTED_PHASE
+        return None
+
+    def _start_yen(self):
+        """Replaces the deviation paths with the shortest path as the only
+        candidate path of Yen's algorithm."""
+        algorithm = self._algorithm
+        zero_cost = 0 if algorithm._integer_weights else 0.0
+        self._candidate_paths = PathBuffer()
+        self._candidate_paths.push(cost=algorithm._dist[self.source],
+                                   path=algorithm._paths[self.source],
+                                   deviation_index=0,
+                                   deviation_path_cost=zero_cost)
+        self._phase = _YEN_PHASE
+
+    def _next_yen_path(self):
+        """Returns the next path from Yen's algorithm which has not been
+        found by the deviation path algorithm.
+
+        Returns
+        -------
+            : list[str] | None
+                None if all simple paths have been enumerated.
+        """
+        while self._candidate_paths:
+            _, path, _, _ = self._candidate_paths.pop()
+            self._accepted_paths.append(path)
+            # spur paths are searched before returning so that the cursor
+            # is always in a consistent state when suspended
+            self._algorithm.yen_spur_paths(path,
+                                           self._accepted_paths,
+                                           self._candidate_paths)
+            if tuple(path) not in self._simple_paths_found:
+                return path
+
+        self._phase = _EXHAUSTED_PHASE
+        return None
+
+    def to_bytes(self):
+        """Serializes the state of the cursor.
+
+        Nodes are stored as their index in the algorithm's graph and paths
+        are stored as a prefix and the head node of their longest suffix in
+        the reverse shortest path tree. Nodes and edges avoided by the
+        cursor are stored as well.
+
+        Returns
+        -------
+            : bytes
+        """
+        algorithm = self._algorithm
+        node_to_index = algorithm._node_to_index()
+        tree_paths = algorithm._paths
+
+        def pack_indices(nodes):
+            return struct.pack(_INDEX_FORMAT % len(nodes),
+                               *[node_to_index[node] for node in nodes])
+
+        def pack_path(path):
+            # walk back from the target while the path follows the tree
+            prefix_length = len(path) - 1
+            while prefix_length > 0:
+                tree_path = tree_paths.get(path[prefix_length - 1])
+                if (tree_path is None or len(tree_path) < 2
+                        or tree_path[1] != path[prefix_length]):
+                    break
+                prefix_length -= 1
+            if path and path[-1] == algorithm.target:
+                suffix_head = node_to_index[path[prefix_length]]
+            else:
+                prefix_length = len(path)
+                suffix_head = _NO_SUFFIX
+            return (_CURSOR_PATH.pack(prefix_length, suffix_head)
+                    + pack_indices(path[:prefix_length]))
+
+        if algorithm._integer_weights:
+            cursor_entry = _CURSOR_INTEGER_ENTRY
+        else:
+            cursor_entry = _CURSOR_ENTRY
+
+        entries = self._candidate_paths.entries()
+        chunks = [_CURSOR_HEADER.pack(_CURSOR_MAGIC,
+                                      _CURSOR_VERSION,
+                                      algorithm._fingerprint(),
+                                      self._phase,
+                                      len(node_to_index),
+                                      node_to_index[algorithm.target],
+                                      node_to_index[self.source],
+                                      self._consecutive_cycles,
+                                      self._candidate_paths.next_count(),
+                                      len(entries),
+                                      len(self._simple_paths_found),
+                                      len(self._accepted_paths),
+                                      len(algorithm._avoid_nodes),
+                                      len(algorithm._avoid_edges))]
+        chunks.append(pack_indices(list(algorithm._avoid_nodes)))
+        for edge in algorithm._avoid_edges:
+            chunks.append(pack_indices(edge))
+
+        for cost, counter, path, deviation_index, deviation_path_cost in (
+                entries):
+            chunks.append(cursor_entry.pack(cost,
+                                            counter,
+                                            deviation_index,
+                                            deviation_path_cost))
+            chunks.append(pack_path(path))
+
+        for path in self._simple_paths_found:
+            chunks.append(pack_path(path))
+
+        for path in self._accepted_paths:
+            chunks.append(pack_path(path))
+
+        return b''.join(chunks)
+
+    @classmethod
+    def from_bytes(cls, algorithm, data):
+        """Recreates a cursor serialized with `to_bytes`.
+
+        Parameters
+        ----------
+            algorithm : SingleTargetDeviationPathAlgorithm
+                Built from the same graph and target as the algorithm
+                which created the cursor
+
+            data : bytes
+
+        Returns
+        -------
+            : PathCursor
+
+        Raises
+        ------
+            ValueError : If `data` is not a cursor for `algorithm`
+        """
+        try:
+            return cls._from_bytes(algorithm, data)
+        except (struct.error, IndexError, KeyError):
+            raise ValueError('data is not a valid serialized cursor')
+
+    @classmethod
+    def _from_bytes(cls, algorithm, data):
+        """Recreates a cursor serialized with `to_bytes` without converting
+        errors from malformed data to ValueError."""
+        nodes = algorithm._index_to_node()
+
+        (magic, version, fingerprint, phase, num_nodes, target_index,
+         source_index, consecutive_cycles, next_count, num_entries,
+         num_paths_found, num_accepted_paths, num_avoid_nodes,
+         num_avoid_edges) = _CURSOR_HEADER.unpack_from(data, 0)
+        if magic != _CURSOR_MAGIC or version != _CURSOR_VERSION:
+            raise ValueError('data is not a serialized cursor')
+        if (fingerprint != algorithm._fingerprint()
+                or num_nodes != len(nodes)
+                or nodes[target_index] != algorithm.target):
+            raise ValueError('cursor was not created for this graph '
+                             'and target')
+        offset = _CURSOR_HEADER.size
+
+        def unpack_indices(position, length):
+            indices = struct.unpack_from(_INDEX_FORMAT % length, data,
+                                         position)
+            return [nodes[index] for index in indices], position + 4 * length
+
+        def unpack_path(position):
+            prefix_length, suffix_head = _CURSOR_PATH.unpack_from(data,
+                                                                  position)
+            path, position = unpack_indices(position + _CURSOR_PATH.size,
+                                            prefix_length)
+            if suffix_head != _NO_SUFFIX:
+                path = path + tree_paths[nodes[suffix_head]]
+            return path, position
+
+        avoid_nodes, offset = unpack_indices(offset, num_avoid_nodes)
+        avoid_edges = []
+        for _ in range(num_avoid_edges):
+            edge, offset = unpack_indices(offset, 2)
+            avoid_edges.append(tuple(edge))
+        if avoid_nodes or avoid_edges:
+            algorithm = algorithm._restricted(avoid_nodes, avoid_edges)
+        tree_paths = algorithm._paths
+
+        if algorithm._integer_weights:
+            cursor_entry = _CURSOR_INTEGER_ENTRY
+        else:
+            cursor_entry = _CURSOR_ENTRY
+
+        entries = []
+        for _ in range(num_entries):
+            (cost, counter, deviation_index,
+             deviation_path_cost) = cursor_entry.unpack_from(data, offset)
+            path, offset = unpack_path(offset + cursor_entry.size)
+            entries.append((cost,
+                            counter,
+                            path,
+                            deviation_index,
+                            deviation_path_cost))
+
+        simple_paths_found = set()
+        for _ in range(num_paths_found):
+            path, offset = unpack_path(offset)
+            simple_paths_found.add(tuple(path))
+
+        accepted_paths = []
+        for _ in range(num_accepted_paths):
+            path, offset = unpack_path(offset)
+            accepted_paths.append(path)
+
+        cursor = cls.__new__(cls)
+        cursor._algorithm = algorithm
+        cursor.source = nodes[source_index]
+        cursor._candidate_paths = PathBuffer.from_entries(entries, next_count)
+        cursor._simple_paths_found = simple_paths_found
+        cursor._consecutive_cycles = consecutive_cycles
+        cursor._accepted_paths = accepted_paths
+        cursor._phase = phase
+        return cursor
+
 
 class SingleTargetDeviationPathAlgorithm(object):
     """Implements the deviation path algorithm in "A New Algorithm for
@@ -79,7 +603,8 @@ class SingleTargetDeviationPathAlgorithm(object):
                  G_reverse,
                  target,
                  weight='weight',
-                 max_consecutive_cycles=500):
+                 max_consecutive_cycles=500,
+                 integer_weights=False):
         """Input Parameters
 
         Parameters
@@ -102,14 +627,43 @@ class SingleTargetDeviationPathAlgorithm(object):
                 before reverting to Yen's algorithm. Set to None or negative
                 value if one wants to search for an unlimited number of
                 deviation paths.
+
+            integer_weights : bool
+                If True, all weights must be non-negative integers. The
+                reverse shortest path tree is then computed with a radix
+                heap and path costs are exact.
         """
+        nx = _nx()
         if target not in G:
             raise nx.NodeNotFound('target node %s not in graph' % target)
 
-        dist, paths = nx.single_source_dijkstra(G_reverse, target)
+        if integer_weights:
+            dist, paths = radix_heap_dijkstra(G_reverse, target)
+        else:
+            dist, paths = nx.single_source_dijkstra(G_reverse, target)
         for node in paths:
             paths[node] = paths[node][::-1]
 
+        self._init_attributes(G,
+                              G_reverse,
+                              target,
+                              dist,
+                              paths,
+                              weight,
+                              max_consecutive_cycles,
+                              integer_weights)
+
+    def _init_attributes(self,
+                         G,
+                         G_reverse,
+                         target,
+                         dist,
+                         paths,
+                         weight,
+                         max_consecutive_cycles,
+                         integer_weights):
+        """Sets the attributes of the algorithm given the shortest paths
+        from every node to `target`."""
         self.target = target
         self.graph = G
         self._graph_reverse = G_reverse
@@ -118,30 +672,139 @@ class SingleTargetDeviationPathAlgorithm(object):
         self._sorted_arcs = {}
         self._max_consecutive_cycles = max_consecutive_cycles
         self._weight = weight
+        self._integer_weights = integer_weights
+        self._nodes = None
+        self._node_indices = None
+        self._tree_children = None
+        self._graph_fingerprint = None
+        self._avoid_nodes = frozenset()
+        self._avoid_edges = frozenset()
 
     @classmethod
     def create_from_graph(cls,
                           G,
                           target,
                           weight='weight',
-                          max_consecutive_cycles=500):
+                          max_consecutive_cycles=500,
+                          integer_weights=None):
         """Creates graph and graph_reverse from G with
         only `weight` attribute.
+
+        If `integer_weights` is None, the integer weight mode is used when
+        every weight is a non-negative integer (or `weight` is None).
+
+        Raises
+        ------
+            ValueError : If `integer_weights` is True and some weight is
+                not a non-negative integer
         """
-        graph = nx.DiGraph()
-        for src, dst, data in G.edges(data=True):
-            if weight is None:
-                graph.add_edge(src, dst, weight=1.0)
+        if weight is None:
+            edges = [(src, dst, 1) for src, dst in G.edges()]
+        else:
+            edges = [(src, dst, data[weight])
+                     for src, dst, data in G.edges(data=True)]
+
+        if integer_weights is None or integer_weights:
+            integral_edges = []
+            for src, dst, edge_weight in edges:
+                integral_weight = _integer_weight(edge_weight)
+                if integral_weight is None:
+                    if integer_weights:
+                        raise ValueError(
+                            'weight %s of edge (%s, %s) is not a '
+                            'non-negative integer' % (edge_weight, src, dst)
+                        )
+                    break
+                integral_edges.append((src, dst, integral_weight))
             else:
-                graph.add_edge(src, dst, weight=data[weight])
+                edges = integral_edges
+                integer_weights = True
+
+        if not integer_weights:
+            integer_weights = False
+            if weight is None:
+                edges = [(src, dst, 1.0) for src, dst, _ in edges]
+
+        graph = _nx().DiGraph()
+        for src, dst, edge_weight in edges:
+            graph.add_edge(src, dst, weight=edge_weight)
 
         graph_reverse = graph.reverse()
 
         if weight is None:
             weight = 'weight'
         return cls(
-            graph, graph_reverse, target, weight, max_consecutive_cycles
+            graph, graph_reverse, target, weight, max_consecutive_cycles,
+            integer_weights
+        )
+
+    def _index_to_node(self):
+        """Returns the list of nodes of self.graph, indexed by the node
+        index used to serialize cursors."""
+        if self._nodes is None:
+            self._nodes = list(self.graph)
+        return self._nodes
+
+    def _node_to_index(self):
+        """Returns a dict mapping nodes of self.graph to their index."""
+        if self._node_indices is None:
+            self._node_indices = {
+                node: index
+                for index, node in enumerate(self._index_to_node())
+            }
+        return self._node_indices
+
+    def _fingerprint(self):
+        """Returns a hash of the nodes, edges and weights of self.graph and
+        of the weight mode, used to check that a serialized cursor belongs
+        to this graph."""
+        if self._graph_fingerprint is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(repr(self._integer_weights).encode('utf-8'))
+            for node in self._index_to_node():
+                digest.update(repr((node,)).encode('utf-8'))
+            for src, dst, weight in self.graph.edges(data='weight'):
+                digest.update(repr((src, dst, weight)).encode('utf-8'))
+            self._graph_fingerprint = struct.unpack('<Q', digest.digest())[0]
+        return self._graph_fingerprint
+
+    def _children(self):
+        """Returns a dict mapping each node to the nodes whose shortest path
+        to self.target continues through it."""
+        if self._tree_children is None:
+            self._tree_children = {}
+            for node, path in self._paths.items():
+                if len(path) > 1:
+                    self._tree_children.setdefault(path[1], []).append(node)
+        return self._tree_children
+
+    def _restricted(self, avoid_nodes, avoid_edges):
+        """Returns a view of self with `avoid_nodes` and `avoid_edges`
+        removed from the graph, or self if there is nothing to avoid.
+
+        Nodes and edges not in self.graph are ignored.
+
+        Parameters
+        ----------
+            avoid_nodes : iterable[str] | None
+
+            avoid_edges : iterable[tuple[str, str]] | None
+
+        Returns
+        -------
+            : SingleTargetDeviationPathAlgorithm
+        """
+        avoid_nodes = frozenset(node for node in avoid_nodes or ()
+                                if node in self.graph)
+        avoid_edges = frozenset(
+            (src, dst) for src, dst in avoid_edges or ()
+            if src in self.graph and dst in self.graph[src]
         )
+        if not avoid_nodes and not avoid_edges:
+            return self
+        return _RestrictedDeviationPathAlgorithm(self,
+                                                 avoid_nodes,
+                                                 avoid_edges)
 
     def _update_sorted_arcs(self, tail_node):
         """Updates _sorted_arcs dict."""
@@ -224,6 +887,110 @@ class SingleTargetDeviationPathAlgorithm(object):
                         list_x.push(path_cost + cost, new_path, i, path_cost)
                     break
 
+    def _spur_path(self, spur_node, ignore_nodes, ignore_edges):
+        """Determines the shortest path from `spur_node` to self.target which
+        avoids `ignore_nodes` and `ignore_edges`.
+
+        The distances to self.target are a consistent heuristic, so an A*
+        search is used and the path in the reverse shortest path tree is
+        returned directly if it is not blocked.
+
+        Parameters
+        ----------
+            spur_node : str
+
+            ignore_nodes : set[str]
+
+            ignore_edges : set[tuple[str, str]]
+                Edges leaving `spur_node` which must not be used
+
+        Returns
+        -------
+            (cost, path) : tuple[float, list[str]] | None
+                None if there is no such path.
+        """
+        if spur_node not in self._dist or spur_node in ignore_nodes:
+            return None
+
+        tree_path = self._paths[spur_node]
+        tree_path_is_blocked = (
+            len(tree_path) > 1 and (spur_node, tree_path[1]) in ignore_edges
+            or not ignore_nodes.isdisjoint(tree_path)
+        )
+        if not tree_path_is_blocked:
+            return self._dist[spur_node], tree_path
+
+        # as in networkx's dijkstra, avoid creating a view for every node
+        adjacency = self.graph._adj
+        counter = count()
+        parents = {}
+        heap = [(self._dist[spur_node], next(counter), 0, spur_node, None)]
+        while heap:
+            _, _, cost, node, parent = heappop(heap)
+            if node in parents:
+                continue
+            parents[node] = parent
+            if node == self.target:
+                path = [node]
+                while parents[node] is not None:
+                    node = parents[node]
+                    path.append(node)
+                return cost, path[::-1]
+            for head_node, data in adjacency[node].items():
+                skip_head_node = (
+                    head_node in parents
+                    or head_node not in self._dist
+                    or head_node in ignore_nodes
+                    or (node, head_node) in ignore_edges
+                )
+                if not skip_head_node:
+                    head_node_cost = cost + data['weight']
+                    heappush(heap, (head_node_cost + self._dist[head_node],
+                                    next(counter),
+                                    head_node_cost,
+                                    head_node,
+                                    node))
+        return None
+
+    def yen_spur_paths(self, path, accepted_paths, list_b):
+        """Implementation of the spur paths of Yen's algorithm, see
+        networkx.shortest_simple_paths.
+
+        Parameters
+        ----------
+            path : list[str]
+                The last path accepted
+
+            accepted_paths : list[list[str]]
+                All paths accepted so far, including `path`
+
+            list_b : PathBuffer
+                Candidate paths, with the spur index as deviation index
+        """
+        zero_cost = 0 if self._integer_weights else 0.0
+        root_path_cost = zero_cost
+        root_path_nodes = set()
+        # accepted paths which share the root path
+        sharing_paths = accepted_paths
+        for i in range(len(path) - 1):
+            spur_node = path[i]
+            sharing_paths = [accepted_path for accepted_path in sharing_paths
+                             if len(accepted_path) > i + 1
+                             and accepted_path[i] == spur_node]
+            ignore_edges = {(spur_node, accepted_path[i + 1])
+                            for accepted_path in sharing_paths}
+            spur_path = self._spur_path(spur_node,
+                                        root_path_nodes,
+                                        ignore_edges)
+            if spur_path is not None:
+                spur_path_cost, spur_path = spur_path
+                list_b.push(root_path_cost + spur_path_cost,
+                            path[:i] + spur_path,
+                            i,
+                            zero_cost)
+            root_path_cost += self.graph[spur_node][path[i + 1]]['weight']
+            root_path_nodes.add(spur_node)
+
     def _shortest_simple_paths(self, source):
         """Determines the K shortest simple paths from a source to self.target
 
@@ -238,59 +1005,11 @@ class SingleTargetDeviationPathAlgorithm(object):
                 List of nodes indicating the kth shortest simple path from
                 source to self.target
         """
-        # check that there is actually a path from source to self.target
-        if source in self._paths:
-            candidate_paths = PathBuffer()
+        for path in PathCursor(self, source):
+            yield path
 
-            # first candidate path is the shortest path
-            candidate_paths.push(cost=0.0,
-                                 path=self._paths[source],
-                                 deviation_index=0,
-                                 deviation_path_cost=0.0)
-
-            consecutive_cycles = 0
-            simple_paths_found = set()
-            max_consecutive_cycles_reached = None
-
-            # check whether all candidate paths have been searched
-            while candidate_paths:
-                # search infinitely if max_consecutive_cycles is None or < 0
-                # Yen's algorithm if self._max_consecutive_cycles == 0
-                max_consecutive_cycles_reached = (
-                    self._max_consecutive_cycles is not None
-                    and 0 <= self._max_consecutive_cycles <= consecutive_cycles
-                )
-
-                if max_consecutive_cycles_reached:
-                    break
-                else:
-                    path_cost, path, deviation_index, deviation_path_cost = (
-                        candidate_paths.pop()
-                    )
-
-                    # check for no cycles
-                    if len(set(path)) == len(path):
-                        simple_paths_found.add(tuple(path))
-                        yield path
-                        consecutive_cycles = 0  # reset consecutive cycles to 0
-                    else:
-                        consecutive_cycles += 1
-
-                    self.mps_deviation_paths(path_cost,
-                                             path,
-                                             deviation_index,
-                                             deviation_path_cost,
-                                             candidate_paths)
-
-            if max_consecutive_cycles_reached:
-                for path in nx.shortest_simple_paths(self.graph,
-                                                     source,
-                                                     self.target,
-                                                     'weight'):
-                    if tuple(path) not in simple_paths_found:
-                        yield path
-
-    def shortest_simple_paths(self, source):
+    def shortest_simple_paths(self, source, avoid_nodes=None,
+                              avoid_edges=None):
         """Determines the K shortest simple paths from a source to self.target
 
         Parameters
@@ -298,6 +1017,12 @@ class SingleTargetDeviationPathAlgorithm(object):
             source : str
                 The source node of interest
 
+            avoid_nodes : iterable[str] | None
+                Nodes which the paths must not pass through
+
+            avoid_edges : iterable[tuple[str, str]] | None
+                Directed edges which the paths must not use
+
         Returns
         ------
             : mps._shortest_simple_paths
@@ -308,6 +1033,195 @@ class SingleTargetDeviationPathAlgorithm(object):
             networkx.NodeNotFound : If source is not in graph
         """
         if source not in self.graph:
-            raise nx.NodeNotFound('source node %s not in graph' % source)
+            raise _nx().NodeNotFound('source node %s not in graph' % source)
+
+        return self._restricted(
+            avoid_nodes, avoid_edges
+        )._shortest_simple_paths(source)
+
+    def cursor(self, source, avoid_nodes=None, avoid_edges=None):
+        """Creates a resumable cursor over the K shortest simple paths from
+        a source to self.target
+
+        Parameters
+        ----------
+            source : str
+                The source node of interest
+
+            avoid_nodes : iterable[str] | None
+                Nodes which the paths must not pass through
+
+            avoid_edges : iterable[tuple[str, str]] | None
+                Directed edges which the paths must not use
+
+        Returns
+        ------
+            : mps.PathCursor
+                Iterator which yields the kth shortest simple path and can
+                be serialized with `PathCursor.to_bytes`.
+
+        Raises
+        ------
+            networkx.NodeNotFound : If source is not in graph
+        """
+        if source not in self.graph:
+            raise _nx().NodeNotFound('source node %s not in graph' % source)
 
-        return self._shortest_simple_paths(source)
+        return PathCursor(self._restricted(avoid_nodes, avoid_edges), source)
+
+    def restore_cursor(self, data):
+        """Resumes a cursor serialized with `PathCursor.to_bytes`.
+
+        Parameters
+        ----------
+            data : bytes
+
+        Returns
+        ------
+            : mps.PathCursor
+
+        Raises
+        ------
+            ValueError : If `data` was not serialized from a cursor of an
+                algorithm with the same graph and target
+        """
+        return PathCursor.from_bytes(self, data)
+
+
+class _RestrictedDeviationPathAlgorithm(SingleTargetDeviationPathAlgorithm):
+    """SingleTargetDeviationPathAlgorithm for a single query which avoids
+    some nodes and edges.
+
+    The graphs and the `_sorted_arcs` of unaffected nodes are shared with the
+    unrestricted algorithm. Only the subtree of the reverse shortest path
+    tree below the avoided nodes and edges is recomputed, and nothing is
+    written to the unrestricted algorithm except its lazily computed
+    `_sorted_arcs`.
+    """
+    def __init__(self, algorithm, avoid_nodes, avoid_edges):
+        """
+        Parameters
+        ----------
+            algorithm : SingleTargetDeviationPathAlgorithm
+                The unrestricted algorithm
+
+            avoid_nodes : frozenset[str]
+                Nodes of `algorithm.graph` to avoid
+
+            avoid_edges : frozenset[tuple[str, str]]
+                Edges of `algorithm.graph` to avoid
+        """
+        # in-degrees in the full reverse graph are an upper bound, so
+        # mps_deviation_paths still only stops when there is no other path
+        self._init_attributes(_nx().restricted_view(algorithm.graph,
+                                                    avoid_nodes,
+                                                    avoid_edges),
+                              algorithm._graph_reverse,
+                              algorithm.target,
+                              None,
+                              None,
+                              algorithm._weight,
+                              algorithm._max_consecutive_cycles,
+                              algorithm._integer_weights)
+        # node indices and fingerprint are those of the unrestricted graph
+        self._nodes = algorithm._index_to_node()
+        self._node_indices = algorithm._node_to_index()
+        self._graph_fingerprint = algorithm._fingerprint()
+        self._avoid_nodes = avoid_nodes
+        self._avoid_edges = avoid_edges
+        self._unrestricted = algorithm
+        self._dist, self._paths, self._dirty_nodes = self._repair_tree()
+
+    def _repair_tree(self):
+        """Recomputes the shortest paths to self.target of the nodes whose
+        shortest path uses an avoided node or edge.
+
+        A binary heap is used even with integer weights. Ties must be broken
+        by node index so that the repaired tree is the same in every
+        process, which the buckets of radix_heap_dijkstra do not preserve,
+        and sharing its loop would add an edge filter to the hot loop of
+        the full reverse shortest path tree.
+
+        Returns
+        -------
+            (dist, paths, dirty_nodes) : tuple[_OverlayDict, _OverlayDict, set]
+                `dirty_nodes` are the nodes whose `_sorted_arcs` differ from
+                those of the unrestricted algorithm.
+        """
+        algorithm = self._unrestricted
+        node_to_index = algorithm._node_to_index()
+        # as in networkx's dijkstra, avoid creating a view for every node
+        adjacency = algorithm.graph._adj
+        adjacency_reverse = self._graph_reverse._adj
+        avoid_nodes = self._avoid_nodes
+        avoid_edges = self._avoid_edges
+        children = algorithm._children()
+
+        affected = set()
+        stack = [node for node in avoid_nodes if node in algorithm._paths]
+        for src, dst in avoid_edges:
+            path = algorithm._paths.get(src)
+            # only tree edges change shortest paths
+            if path is not None and len(path) > 1 and path[1] == dst:
+                stack.append(src)
+        while stack:
+            node = stack.pop()
+            if node not in affected:
+                affected.add(node)
+                stack.extend(children.get(node, ()))
+
+        # only the affected nodes are stored, on top of the shared dicts
+        dist = _OverlayDict(algorithm._dist, {}, affected)
+        paths = _OverlayDict(algorithm._paths, {}, affected)
+        repaired_dist = dist._overrides
+        repaired_paths = paths._overrides
+
+        # dijkstra restricted to the affected nodes, starting from the
+        # edges to unaffected nodes whose distances are unchanged. Ties are
+        # broken by node index so that the repaired tree, which serialized
+        # cursors refer to, does not depend on the iteration order of sets.
+        heap = []
+        for node in affected:
+            if node in avoid_nodes:
+                continue
+            for head_node, data in adjacency[node].items():
+                if head_node in dist and (node, head_node) not in avoid_edges:
+                    heappush(heap, (dist[head_node] + data['weight'],
+                                    node_to_index[node],
+                                    node_to_index[head_node],
+                                    node,
+                                    head_node))
+        while heap:
+            node_dist, _, _, node, head_node = heappop(heap)
+            if node in repaired_dist:
+                continue
+            repaired_dist[node] = node_dist
+            repaired_paths[node] = [node] + paths[head_node]
+            for tail_node, data in adjacency_reverse[node].items():
+                if (tail_node in affected
+                        and tail_node not in repaired_dist
+                        and tail_node not in avoid_nodes
+                        and (tail_node, node) not in avoid_edges):
+                    heappush(heap, (node_dist + data['weight'],
+                                    node_to_index[tail_node],
+                                    node_to_index[node],
+                                    tail_node,
+                                    node))
+
+        dirty_nodes = set(affected)
+        dirty_nodes.update(src for src, _ in avoid_edges)
+        for node in affected:
+            dirty_nodes.update(adjacency_reverse[node])
+        return dist, paths, dirty_nodes
+
+    def _update_sorted_arcs(self, tail_node):
+        """Updates _sorted_arcs dict, sharing the sorted arcs of the
+        unrestricted algorithm if they are not affected."""
+        if tail_node in self._dirty_nodes:
+            super(_RestrictedDeviationPathAlgorithm,
+                  self)._update_sorted_arcs(tail_node)
+        else:
+            algorithm = self._unrestricted
+            if tail_node not in algorithm._sorted_arcs:
+                algorithm._update_sorted_arcs(tail_node)
+            self._sorted_arcs[tail_node] = algorithm._sorted_arcs[tail_node]
@@ -17,10 +17,11 @@ setup(name='kspath',
       author_email='hfchong@data.gov.sg',
       license='Apache License 2.0',
       packages=find_packages(exclude=['tests']),
-      install_requires=["networkx>=2.1",
-                        "numpy>=1.13.3",
-                        "pandas>=0.21.0",
-                        "scikit-learn>=0.19.1"],
+      install_requires=["networkx>=2.1"],
+      extras_require={"test": ["gitpython",
+                               "numpy>=1.13.3",
+                               "pandas>=0.21.0",
+                               "pytest"]},
       url='https://github.com/datagovsg/k-shortest-path',
       classifiers=['Programming Language :: Python :: 3'],
       zip_safe=False)
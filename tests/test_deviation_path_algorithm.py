@@ -2,7 +2,8 @@ import networkx as nx
 import pytest
 
 from kspath.deviation_path.mps import (
-    SingleTargetDeviationPathAlgorithm
+    SingleTargetDeviationPathAlgorithm,
+    radix_heap_dijkstra
 )
 from tests.utils import check_dpa_mps_implementation, compute_path_weight
 
@@ -85,6 +86,217 @@ def test_deviation_path_fast():
                                                             weight='weight')]
 
 
+@pytest.mark.fast
+@pytest.mark.parametrize('max_consecutive_cycles', [500, 1, 0])
+def test_cursor_resume_from_bytes(max_consecutive_cycles):
+    G = nx.DiGraph()
+
+    G.add_edge(1, 3, weight=0)
+    G.add_edge(1, 2, weight=0)
+    G.add_edge(1, 4, weight=0)
+    G.add_edge(2, 3, weight=1)
+    G.add_edge(2, 4, weight=2)
+    G.add_edge(3, 5, weight=2)
+    G.add_edge(3, 6, weight=2)
+    G.add_edge(4, 5, weight=1)
+    G.add_edge(4, 6, weight=1)
+    G.add_edge(5, 2, weight=1)
+    G.add_edge(5, 6, weight=0)
+
+    dpa_mps = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target=6, weight='weight',
+        max_consecutive_cycles=max_consecutive_cycles
+    )
+
+    for source in range(1, 6):
+        expected_paths = list(dpa_mps.shortest_simple_paths(source))
+
+        paths = []
+        data = dpa_mps.cursor(source).to_bytes()
+        while True:
+            # resume on a fresh instance as another worker would
+            worker_dpa_mps = (
+                SingleTargetDeviationPathAlgorithm.create_from_graph(
+                    G=G, target=6, weight='weight',
+                    max_consecutive_cycles=max_consecutive_cycles
+                )
+            )
+            cursor = worker_dpa_mps.restore_cursor(data)
+            page = cursor.next_paths(2)
+            paths.extend(page)
+            if len(page) < 2:
+                break
+            data = cursor.to_bytes()
+
+        assert paths == expected_paths
+
+
+@pytest.mark.fast
+def test_cursor_restore_wrong_target():
+    G = nx.DiGraph()
+    G.add_edge('a', 'b', weight=0.6)
+    G.add_edge('a', 'c', weight=0.2)
+    G.add_edge('c', 'd', weight=0.1)
+    G.add_edge('a', 'd', weight=0.3)
+
+    dpa_mps_d = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight='weight'
+    )
+    dpa_mps_b = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='b', weight='weight'
+    )
+    data = dpa_mps_d.cursor('a').to_bytes()
+
+    with pytest.raises(ValueError):
+        dpa_mps_b.restore_cursor(data)
+    with pytest.raises(ValueError):
+        dpa_mps_d.restore_cursor(b'KSPC')
+    with pytest.raises(ValueError):
+        dpa_mps_d.restore_cursor(data[:-1])
+
+    # same nodes and target but different weights
+    G['a']['d']['weight'] = 0.05
+    dpa_mps_other = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight='weight'
+    )
+    with pytest.raises(ValueError):
+        dpa_mps_other.restore_cursor(data)
+    with pytest.raises(nx.NodeNotFound):
+        dpa_mps_d.cursor('z')
+
+
+@pytest.mark.fast
+def test_integer_weights():
+    G = nx.DiGraph()
+    G.add_edge('a', 'b', weight=6)
+    G.add_edge('a', 'c', weight=2.0)
+    G.add_edge('c', 'd', weight=2)
+    G.add_edge('a', 'd', weight=3)
+
+    dpa_mps = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight='weight'
+    )
+    assert dpa_mps._integer_weights
+    assert list(dpa_mps.shortest_simple_paths('a')) == [['a', 'd'],
+                                                        ['a', 'c', 'd']]
+
+    dpa_mps = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight=None
+    )
+    assert dpa_mps._integer_weights
+
+    G.add_edge('c', 'd', weight=0.5)
+    dpa_mps = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight='weight'
+    )
+    assert not dpa_mps._integer_weights
+
+    with pytest.raises(ValueError):
+        SingleTargetDeviationPathAlgorithm.create_from_graph(
+            G=G, target='d', weight='weight', integer_weights=True
+        )
+
+
+@pytest.mark.fast
+def test_cursor_integer_costs_are_exact():
+    G = nx.DiGraph()
+    G.add_edge('a', 'd', weight=1)
+    G.add_edge('a', 'b', weight=2 ** 60 + 1)
+    G.add_edge('b', 'd', weight=1)
+    G.add_edge('a', 'c', weight=2 ** 60 + 2)
+    G.add_edge('c', 'd', weight=1)
+
+    dpa_mps = SingleTargetDeviationPathAlgorithm.create_from_graph(
+        G=G, target='d', weight='weight'
+    )
+    cursor = dpa_mps.cursor('a')
+    assert cursor.next_paths(1) == [['a', 'd']]
+
+    # costs which are not exact as doubles survive serialization
+    resumed_cursor = dpa_mps.restore_cursor(cursor.to_bytes())
+    assert (
+        sorted(entry[0] for entry in resumed_cursor._candidate_paths.entries())
+        == [2 ** 60 + 1]
+    )
+    assert list(resumed_cursor) == [['a', 'b', 'd'], ['a', 'c', 'd']]
+
+
+@pytest.mark.fast
+def test_radix_heap_dijkstra():
+    G = nx.gnm_random_graph(200, 1000, seed=1, directed=True)
+    for index, (src, dst) in enumerate(G.edges()):
+        G[src][dst]['weight'] = (index * 7919) % 1000
+
+    dist, paths = radix_heap_dijkstra(G, 0)
+    expected_dist = nx.single_source_dijkstra_path_length(G, 0)
+
+    assert dist == expected_dist
+    for node, path in paths.items():
+        assert path[0] == 0 and path[-1] == node
+        assert compute_path_weight(G, 'weight', path) == dist[node]
+
+
+@pytest.mark.fast
+def test_avoid_nodes_and_edges():
+    G = nx.DiGraph()
+
+    G.add_edge(1, 3, weight=0)
+    G.add_edge(1, 2, weight=0)
+    G.add_edge(1, 4, weight=0)
+    G.add_edge(2, 3, weight=1)
+    G.add_edge(2, 4, weight=2)
+    G.add_edge(3, 5, weight=2)
+    G.add_edge(3, 6, weight=2)
+    G.add_edge(4, 5, weight=1)
+    G.add_edge(4, 6, weight=1)
+    G.add_edge(5, 2, weight=1)
+    G.add_edge(5, 6, weight=0)
+
+    dpa_mps = (
+        SingleTargetDeviationPathAlgorithm
+        .create_from_graph(G=G, target=6, weight='weight')
+    )
+    paths_before = {source: list(dpa_mps.shortest_simple_paths(source))
+                    for source in range(1, 6)}
+
+    avoid_nodes = [4]
+    avoid_edges = [(5, 6), (2, 3)]
+    G_avoid = G.copy()
+    G_avoid.remove_nodes_from(avoid_nodes)
+    G_avoid.remove_edges_from(avoid_edges)
+    dpa_mps_avoid = (
+        SingleTargetDeviationPathAlgorithm
+        .create_from_graph(G=G_avoid, target=6, weight='weight')
+    )
+
+    for source in [1, 2, 3, 5]:
+        paths = list(dpa_mps.shortest_simple_paths(source,
+                                                   avoid_nodes=avoid_nodes,
+                                                   avoid_edges=avoid_edges))
+        expected_paths = list(dpa_mps_avoid.shortest_simple_paths(source))
+        assert sorted(paths) == sorted(expected_paths)
+        assert (
+            [compute_path_weight(G, 'weight', path) for path in paths]
+            == [compute_path_weight(G, 'weight', path)
+                for path in expected_paths]
+        )
+
+        cursor = dpa_mps.cursor(source,
+                                avoid_nodes=avoid_nodes,
+                                avoid_edges=avoid_edges)
+        first_page = cursor.next_paths(1)
+        resumed_cursor = dpa_mps.restore_cursor(cursor.to_bytes())
+        assert first_page + list(resumed_cursor) == paths
+
+    assert list(dpa_mps.shortest_simple_paths(4, avoid_nodes=[4])) == []
+
+    # shared state is not modified by queries with avoided nodes and edges
+    for source in range(1, 6):
+        assert list(dpa_mps.shortest_simple_paths(source)) == (
+            paths_before[source]
+        )
+
+
 @pytest.mark.slow
 def test_deviation_path(test_graph_data):
     test_graph, _ = test_graph_data
@@ -0,0 +1,54 @@
+import json
+from os import path
+import subprocess
+import sys
+
+import pytest
+
+
+IMPORT_TIME_BUDGET = 0.1  # seconds
+HEAVY_MODULES = ['networkx', 'numpy', 'pandas', 'sklearn']
+
+IMPORT_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import kspath
+import kspath.deviation_path.mps
+elapsed = time.perf_counter() - start
+
+print(json.dumps({
+    'elapsed': elapsed,
+    'heavy_modules': [module for module in %r if module in sys.modules]
+}))
+"""
+
+
+def measure_import():
+    """Imports kspath in a fresh interpreter.
+
+    Returns
+    -------
+        : dict
+            'elapsed' is the import time in seconds and 'heavy_modules'
+            lists the heavy modules imported as a side effect.
+    """
+    output = subprocess.check_output(
+        [sys.executable, '-c', IMPORT_SCRIPT % HEAVY_MODULES],
+        cwd=path.dirname(path.dirname(path.realpath(__file__)))
+    )
+    return json.loads(output.decode('utf-8'))
+
+
+@pytest.mark.fast
+def test_import_is_lazy():
+    assert measure_import()['heavy_modules'] == []
+
+
+@pytest.mark.fast
+def test_import_time():
+    # best of a few runs to reduce noise from a cold disk cache
+    elapsed = min(measure_import()['elapsed'] for _ in range(3))
+    assert elapsed < IMPORT_TIME_BUDGET